@@ -1,5 +1,6 @@
 import os
 import json
+import shutil
 from typing import Dict, Tuple, List, Any
 
 
@@ -46,16 +47,51 @@ def parse_decile_sequence(sequence: str, sorted_positions: List[Tuple[int, int,
     return pos_decile
 
 
+def get_chunk_pos(mc_x: int, mc_z: int) -> Tuple[int, int]:
+    """MC世界坐标→区块坐标（每区块16x16）"""
+    return mc_x >> 4, mc_z >> 4
+
+
+def get_chunk_ranges(min_x: int, max_x: int, min_z: int, max_z: int) -> List[Tuple[int, int, int, int]]:
+    """将坐标范围按区块边界切分，返回每个区块内的 (x1, z1, x2, z2)，按区块 (z, x) 排序"""
+    min_cx, min_cz = get_chunk_pos(min_x, min_z)
+    max_cx, max_cz = get_chunk_pos(max_x, max_z)
+    ranges = []
+    for cz in range(min_cz, max_cz + 1):
+        for cx in range(min_cx, max_cx + 1):
+            x1 = max(min_x, cx << 4)
+            x2 = min(max_x, (cx << 4) + 15)
+            z1 = max(min_z, cz << 4)
+            z2 = min(max_z, (cz << 4) + 15)
+            ranges.append((x1, z1, x2, z2))
+    return ranges
+
+
+def group_setblocks_by_chunk(blocks: Dict[Tuple[int, int], str], y: int) -> Dict[Tuple[int, int], List[str]]:
+    """将 (mc_x, mc_z)→方块 按区块分组生成setblock指令，区块按 (z, x) 排序，区块内同样按 (z, x) 排序"""
+    chunk_commands = {}
+    for mc_x, mc_z in sorted(blocks, key=lambda p: (p[1] >> 4, p[0] >> 4, p[1], p[0])):
+        chunk = get_chunk_pos(mc_x, mc_z)
+        chunk_commands.setdefault(chunk, []).append(f"setblock {mc_x} {y} {mc_z} {blocks[(mc_x, mc_z)]}")
+    return chunk_commands
+
+
 def generate_mc_functions_with_keyframe_sequence(
         cleaned_data: Dict,
         mapping: BlockDecileMapping,
         version_name: str,
         start_x: int = 0,
         y: int = 0,
-        start_z: int = 0
+        start_z: int = 0,
+        split_by_chunk: bool = False,
+        load_delay_ticks: int = 20
 ) -> None:
     """
     关键帧复用0-9序列生成MC函数，增量帧仅生成变化方块
+    帧内指令按区块顺序输出，start/clean 中对显示区域涉及的区块 forceload add/remove
+    forceload add 仅添加加载票据，区块在之后的tick才真正加载，因此 start 只负责 forceload，
+    并在 load_delay_ticks 个tick后调度 init 执行按区块 fill，再由 init 调度首帧
+    split_by_chunk=True 时每帧按区块拆分为子函数 {帧号}/{区块x}_{区块z}，帧函数依次调用
     """
     output_root = f"function/{version_name}"
     os.makedirs(output_root, exist_ok=True)
@@ -76,26 +112,41 @@ def generate_mc_functions_with_keyframe_sequence(
     min_z = 0 + start_z
     max_z = max_z_idx + start_z
 
-    # 3. 生成初始化函数
+    chunk_ranges = get_chunk_ranges(min_x, max_x, min_z, max_z)
+
+    # 3. 生成启动函数（仅 forceload 显示区域内所有区块，等待区块加载后再调度 init）
+    start_path = os.path.join(output_root, "start.mcfunction")
+    with open(start_path, "w", encoding="utf-8") as f:
+        for x1, z1, x2, z2 in chunk_ranges:
+            f.write(f"forceload add {x1} {z1}\n")
+        f.write(f"schedule function badapple:{version_name}/init {load_delay_ticks}t\n")
+    print(f"已生成启动函数: {start_path}（{len(chunk_ranges)}个区块）")
+
+    # 生成初始化函数（区块已加载，按区块 fill 后调度首帧）
     init_block = get_block_by_decile(0, mapping)
-    init_path = os.path.join(output_root, "start.mcfunction")
+    init_path = os.path.join(output_root, "init.mcfunction")
     all_frame_nums = sorted(list(keyframe_sequences.keys()) + list(delta_frames.keys()))
     first_frame = min(all_frame_nums)
     with open(init_path, "w", encoding="utf-8") as f:
-        f.write(f"fill {min_x} {y} {min_z} {max_x} {y} {max_z} {init_block}\n")
+        for x1, z1, x2, z2 in chunk_ranges:
+            f.write(f"fill {x1} {y} {z1} {x2} {y} {z2} {init_block}\n")
         f.write(f"schedule function badapple:{version_name}/{first_frame} 1t\n")
     print(f"已生成初始化函数: {init_path}")
 
-    # 4. 生成清除函数
+    # 4. 生成清除函数（按区块清除后释放 forceload）
     clean_path = os.path.join(output_root, "clean.mcfunction")
     with open(clean_path, "w", encoding="utf-8") as f:
-        f.write(f"fill {min_x} {y} {min_z} {max_x} {y} {max_z} minecraft:air\n")
+        for x1, z1, x2, z2 in chunk_ranges:
+            f.write(f"fill {x1} {y} {z1} {x2} {y} {z2} minecraft:air\n")
+        for x1, z1, x2, z2 in chunk_ranges:
+            f.write(f"forceload remove {x1} {z1}\n")
     print(f"已生成清除函数: {clean_path}")
 
     # 5. 生成帧函数（关键帧解析0-9序列，增量帧用delta_frames）
     last_keyframe_blocks = {}
     for frame_count in all_frame_nums:
         function_content = []
+        frame_blocks = {}
         if frame_count in keyframe_sequences:
             # 关键帧：解析0-9序列→生成方块指令
             sequence = keyframe_sequences[frame_count]
@@ -103,9 +154,7 @@ def generate_mc_functions_with_keyframe_sequence(
             current_blocks = {}
             for pos, decile in pos_decile.items():
                 block = get_block_by_decile(decile, mapping)
-                mc_x = pos[0] + start_x
-                mc_z = pos[2] + start_z
-                function_content.append(f"setblock {mc_x} {y} {mc_z} {block}")
+                frame_blocks[(pos[0] + start_x, pos[2] + start_z)] = block
                 current_blocks[pos] = block
             last_keyframe_blocks = current_blocks.copy()
             print(f"生成关键帧函数: {frame_count}（解析0-9序列，长度{len(sequence)}）")
@@ -114,11 +163,26 @@ def generate_mc_functions_with_keyframe_sequence(
             frame_delta = delta_frames[frame_count]
             for pos, decile in frame_delta.items():
                 block = get_block_by_decile(decile, mapping)
-                mc_x = pos[0] + start_x
-                mc_z = pos[2] + start_z
-                function_content.append(f"setblock {mc_x} {y} {mc_z} {block}")
+                frame_blocks[(pos[0] + start_x, pos[2] + start_z)] = block
             print(f"生成增量帧函数: {frame_count}（{len(frame_delta)}个变化方块）")
 
+        # 按区块顺序输出，拆分时每个区块写入独立子函数
+        chunk_commands = group_setblocks_by_chunk(frame_blocks, y)
+        # 清除上次生成残留的区块子函数（坐标/尺寸变化或关闭拆分后不再被调用）
+        chunk_root = os.path.join(output_root, str(frame_count))
+        if os.path.isdir(chunk_root):
+            shutil.rmtree(chunk_root)
+        if split_by_chunk:
+            os.makedirs(chunk_root)
+            for (cx, cz), commands in chunk_commands.items():
+                chunk_path = os.path.join(chunk_root, f"{cx}_{cz}.mcfunction")
+                with open(chunk_path, "w", encoding="utf-8") as f:
+                    f.write("\n".join(commands))
+                function_content.append(f"function badapple:{version_name}/{frame_count}/{cx}_{cz}")
+        else:
+            for commands in chunk_commands.values():
+                function_content.extend(commands)
+
         # 调度下一帧
         if frame_count < max(all_frame_nums):
             next_frame = [f for f in all_frame_nums if f > frame_count][0]
@@ -155,5 +219,6 @@ if __name__ == "__main__":
         version_name=VERSION_NAME,
         start_x=0,
         y=0,
-        start_z=0
+        start_z=0,
+        split_by_chunk=False
     )
\ No newline at end of file
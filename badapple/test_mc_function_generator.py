@@ -0,0 +1,31 @@
+from mc_function_generator import get_chunk_pos, get_chunk_ranges, group_setblocks_by_chunk
+
+
+def test_get_chunk_pos_negative():
+    assert get_chunk_pos(-1, -16) == (-1, -1)
+    assert get_chunk_pos(-17, 0) == (-2, 0)
+    assert get_chunk_pos(15, 16) == (0, 1)
+
+
+def test_get_chunk_ranges_clipped():
+    # 原点 -8/-8 的 20x20 显示区域跨 4 个区块，按区块 (z, x) 排序并裁剪到显示范围
+    assert get_chunk_ranges(-8, 11, -8, 11) == [
+        (-8, -8, -1, -1), (0, -8, 11, -1),
+        (-8, 0, -1, 11), (0, 0, 11, 11),
+    ]
+
+
+def test_group_setblocks_by_chunk_order():
+    blocks = {(5, 3): "b", (-1, 3): "a", (-3, 3): "c", (2, -1): "d", (-2, -20): "e"}
+    chunk_commands = group_setblocks_by_chunk(blocks, 4)
+    assert list(chunk_commands) == [(-1, -2), (0, -1), (-1, 0), (0, 0)]
+    assert chunk_commands[(-1, 0)] == ["setblock -3 4 3 c",
+                                       "setblock -1 4 3 a"]
+    assert chunk_commands[(0, -1)] == ["setblock 2 4 -1 d"]
+
+
+if __name__ == "__main__":
+    test_get_chunk_pos_negative()
+    test_get_chunk_ranges_clipped()
+    test_group_setblocks_by_chunk_order()
+    print("区块辅助函数检查通过")